@@ -274,6 +274,11 @@ class DatasetFetcher():
 
 			self._logger.log('Queue size:', boundary.qsize())
 
+	def get_users(self):
+		"""Returns the details of all users obtained by get_dataset
+		"""
+		return self._visited
+
 	def save_dataset(self, users_path, adj_list_path):
 		"""Save the dataset obtained by get_dataset
 
@@ -338,6 +343,11 @@ class ListToMatrixConverter():
 		for i in id_index_map:
 			self._index_id_map[id_index_map[i]] = i
 
+	def get_index_id_map(self):
+		"""Returns the map from link matrix index to user id created by convert
+		"""
+		return self._index_id_map
+
 	def save(self, map_path, link_matrix_path, use_sparse=False):
 		"""Saves the map and link matrix created using the convert function
 
@@ -367,6 +377,123 @@ class ListToMatrixConverter():
 					except Exception as e:
 						self._logger.log('Exception:', repr(e))
 
+class UserTable():
+	"""An instance of UserTable stores the details of all users as columns
+	aligned to the link matrix index
+
+	Names and screen names are stored as offset-encoded utf-8 columns, and
+	hash indices from screen name and user id to link matrix index are built
+	once when the table is created
+	"""
+
+	def __init__(self, users, index_id_map):
+		"""Initializes an instance of UserTable
+
+		Args:
+			users: Dictionary containing details of all users, keyed by user id
+			index_id_map: Dictionary representing a map from link matrix index
+			to user id
+		"""
+		size = len(index_id_map)
+		self._ids = np.array([index_id_map[i] for i in range(size)], dtype=np.int64)
+		self._name_offsets, self._name_data = self._encode(
+			[users[index_id_map[i]]['name'] for i in range(size)])
+		self._screen_name_offsets, self._screen_name_data = self._encode(
+			[users[index_id_map[i]]['screen_name'] for i in range(size)])
+		self._build_indices()
+
+	@staticmethod
+	def _encode(strings):
+		"""Returns the offsets and the concatenated utf-8 bytes of strings, such
+		that string i is data[offsets[i]:offsets[i + 1]]
+		"""
+		encoded = [k.encode('utf-8') for k in strings]
+		offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+		offsets[1:] = np.cumsum([len(k) for k in encoded])
+		data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+		return offsets, data
+
+	@staticmethod
+	def _decode(offsets, data, index):
+		"""Returns string index of an offset-encoded column
+		"""
+		return data[offsets[index]:offsets[index + 1]].tobytes().decode('utf-8')
+
+	def _build_indices(self):
+		"""Builds the maps from user id and screen name to link matrix index
+		"""
+		self._id_index_map = {}
+		for index, user_id in enumerate(self._ids.tolist()):
+			self._id_index_map[user_id] = index
+		self._screen_name_index_map = {}
+		for index in range(len(self._ids)):
+			self._screen_name_index_map[self.get_screen_name(index)] = index
+
+	def __len__(self):
+		"""Returns the number of users in the table
+		"""
+		return len(self._ids)
+
+	def get_id(self, index):
+		"""Returns the user id of the user at a link matrix index
+		"""
+		return int(self._ids[index])
+
+	def get_name(self, index):
+		"""Returns the name of the user at a link matrix index
+		"""
+		return self._decode(self._name_offsets, self._name_data, index)
+
+	def get_screen_name(self, index):
+		"""Returns the screen name of the user at a link matrix index
+		"""
+		return self._decode(self._screen_name_offsets, self._screen_name_data, index)
+
+	def get_screen_names(self, indices):
+		"""Returns the screen names of the users at the given link matrix indices
+		"""
+		return [self.get_screen_name(i) for i in indices]
+
+	def index_of_id(self, user_id):
+		"""Returns the link matrix index of the user with the given user id
+		"""
+		return self._id_index_map[user_id]
+
+	def index_of_screen_name(self, screen_name):
+		"""Returns the link matrix index of the user with the given screen name
+		"""
+		return self._screen_name_index_map[screen_name]
+
+	def save(self, user_table_path):
+		"""Saves the columns of the table
+
+		Args:
+			user_table_path: Path to the file where the table is to be stored
+		"""
+		with open(user_table_path, mode='wb') as f:
+			np.savez(f, ids=self._ids,
+				name_offsets=self._name_offsets, name_data=self._name_data,
+				screen_name_offsets=self._screen_name_offsets,
+				screen_name_data=self._screen_name_data)
+
+	@classmethod
+	def load(cls, user_table_path):
+		"""Returns the table stored in a file by save
+
+		Args:
+			user_table_path: Path to the file where the table is stored
+		"""
+		table = cls.__new__(cls)
+		with open(user_table_path, mode='rb') as f:
+			columns = np.load(f)
+			table._ids = columns['ids']
+			table._name_offsets = columns['name_offsets']
+			table._name_data = columns['name_data']
+			table._screen_name_offsets = columns['screen_name_offsets']
+			table._screen_name_data = columns['screen_name_data']
+		table._build_indices()
+		return table
+
 
 def main():
 
@@ -381,6 +508,7 @@ def main():
 	map_path = '../data/map'
 	dense_link_matrix_path = '../data/dense_link_matrix'
 	sparse_link_matrix_path = '../data/sparse_link_matrix'
+	user_table_path = '../data/user_table'
 
 	users_temp_path = '../data/temp/users_'
 	adj_list_temp_path = '../data/temp/adj_list_'
@@ -409,6 +537,10 @@ def main():
 	c = ListToMatrixConverter(adj_list_path)
 	c.convert()
 	c.save(map_path, sparse_link_matrix_path, use_sparse=True)
+
+	# Store info of all users as columns aligned to the link matrix index
+	t = UserTable(app.get_users(), c.get_index_id_map())
+	t.save(user_table_path)
 	logger.log('Dataset Saved')
 
 if __name__ == '__main__':
@@ -2,8 +2,9 @@ import numpy as np
 import scipy.sparse as sparse
 import time
 import pickle
+from multiprocessing import Pipe, Process
 from igraph import *
-from dataset_fetcher import ListToMatrixConverter
+from dataset_fetcher import ListToMatrixConverter, UserTable
 import matplotlib.pyplot as plt
 import matplotlib.patches as mp
 import time
@@ -21,9 +22,10 @@ class HITS():
 
 		Args:
 			link_matrix: The link matrix
-			users: Details of all users
+			users: Details of all users, either as a UserTable or as a dictionary
+			keyed by user id
 			index_id_map: Dictionary representing a map from link matrix index
-			to user id
+			to user id (not needed if users is a UserTable)
 			is_sparse: True if the links matrix is a sparse matrix
 		"""
 		self.__is_sparse = is_sparse
@@ -33,9 +35,10 @@ class HITS():
 		self.__hubs = np.ones(self.__n)
 		self.__auths = np.ones(self.__n)
 		self.__size = 30
-		self.__names = [users[index_id_map[i]]['screen_name'] for i in range(0,self.__size)]
-		self.__index_id_map = index_id_map
-		self.__users = users
+		if not isinstance(users, UserTable):
+			users = UserTable(users, index_id_map)
+		self.__user_table = users
+		self.__names = self.__user_table.get_screen_names(range(0,self.__size))
 		self.all_hubs = []
 		self.all_auths = []
 
@@ -139,12 +142,14 @@ class HITS():
 		visual_style["edge_width"] = 4
 		plot(g, **visual_style)
 
+	def get_user_table(self):
+		"""Returns the table containing details of all users
+		"""
+		return self.__user_table
+
 	def plot_stats(self):
-		screen_name_index_map = {}
-		for key in self.__index_id_map:
-			screen_name_index_map[self.__users[self.__index_id_map[key]]['screen_name']] = key
-		
 		cands = ['austinnotduncan', 'str_mape', 'LeoDiCaprio', 'aidanf123', 'MKBHD']
+		cand_indices = [self.__user_table.index_of_screen_name(k) for k in cands]
 		colors = ['green', 'cyan', 'magenta', 'blue', 'brown']
 		all_hubs = np.array(self.all_hubs)
 		all_auths = np.array(self.all_auths)
@@ -156,7 +161,7 @@ class HITS():
 		legend_handles = []
 		for i in range(len(cands)):
 			legend_handles.append(mp.Patch(label=cands[i], color=colors[i]))
-			ax.plot(np.arange(1, all_hubs.shape[0] + 1), all_hubs[:, screen_name_index_map[cands[i]]], color=colors[i])
+			ax.plot(np.arange(1, all_hubs.shape[0] + 1), all_hubs[:, cand_indices[i]], color=colors[i])
 		ax.legend(handles=legend_handles)
 		ax.set_title("Change in hubbiness score with increasing iterations")
 		plt.show()
@@ -168,11 +173,162 @@ class HITS():
 		legend_handles = []
 		for i in range(len(cands)):
 			legend_handles.append(mp.Patch(label=cands[i], color=colors[i]))
-			ax.plot(np.arange(1, all_auths.shape[0] + 1), all_auths[:, screen_name_index_map[cands[i]]], color=colors[i])
+			ax.plot(np.arange(1, all_auths.shape[0] + 1), all_auths[:, cand_indices[i]], color=colors[i])
 		ax.legend(handles=legend_handles)
 		ax.set_title("Change in authority score with increasing iterations")
 		plt.show()
 
+def _hits_worker(conn, link_matrix_block, is_sparse):
+	"""Runs the part of HITS owned by one row block of the link matrix
+
+	Each iteration, sends the partial authority vector contributed by the
+	block, receives the normalized authority vector, sends the hubbiness of
+	the rows in the block and receives the global max and a stop flag
+
+	Args:
+		conn: Connection to the driver
+		link_matrix_block: The rows of the link matrix owned by this worker
+		is_sparse: True if the link matrix block is a sparse matrix
+	"""
+	link_matrix_block_tr = link_matrix_block.transpose()
+	hubs = np.ones(link_matrix_block.shape[0])
+	try:
+		while True:
+			if is_sparse:
+				partial_auths = link_matrix_block_tr * hubs
+			else:
+				partial_auths = np.dot(link_matrix_block_tr, hubs)
+			conn.send_bytes(np.asarray(partial_auths, dtype=np.float64).tobytes())
+
+			auths = np.frombuffer(conn.recv_bytes(), dtype=np.float64)
+			if is_sparse:
+				hubs = link_matrix_block * auths
+			else:
+				hubs = np.dot(link_matrix_block, auths)
+			hubs = np.asarray(hubs, dtype=np.float64)
+			conn.send_bytes(hubs.tobytes())
+
+			max_score, done = np.frombuffer(conn.recv_bytes(), dtype=np.float64)
+			if max_score != 0:
+				hubs = hubs / max_score
+			if done:
+				break
+	except EOFError:
+		pass
+	finally:
+		conn.close()
+
+class ShardedHITS(HITS):
+	"""An instance of ShardedHITS executes the HITS algorithm with the rows of
+	the link matrix split into blocks across several worker processes
+	"""
+
+	def __init__(self, link_matrix, users, index_id_map, is_sparse=False, num_workers=2):
+		"""
+		Initializes an instance of ShardedHITS
+
+		Args:
+			link_matrix: The link matrix
+			users: Details of all users, either as a UserTable or as a dictionary
+			keyed by user id
+			index_id_map: Dictionary representing a map from link matrix index
+			to user id (not needed if users is a UserTable)
+			is_sparse: True if the links matrix is a sparse matrix
+			num_workers: Number of worker processes to split the rows across
+		"""
+		super().__init__(link_matrix, users, index_id_map, is_sparse=is_sparse)
+		self.__is_sparse = is_sparse
+		self.__link_matrix = link_matrix
+		self.__n = link_matrix.shape[0]
+		self.__num_workers = num_workers
+		self.__hubs = np.ones(self.__n)
+		self.__auths = np.ones(self.__n)
+		self.comm_volume = []
+
+	def calc_scores(self, epsilon=1e-4):
+		"""Calculates hubbiness and authority
+
+		The driver sums the partial authority vectors sent by the workers and
+		gathers their hubbiness, so that the max-normalization and the
+		convergence check use the global vectors. The number of bytes exchanged
+		with the workers is recorded for each iteration
+		"""
+		epsilon_matrix = epsilon * np.ones(self.__n)
+		bounds = np.linspace(0, self.__n, self.__num_workers + 1).astype(int)
+		conns = []
+		workers = []
+		for i in range(self.__num_workers):
+			conn, worker_conn = Pipe()
+			worker = Process(target=_hits_worker, args=(worker_conn,
+				self.__link_matrix[bounds[i]:bounds[i + 1]], self.__is_sparse))
+			worker.start()
+			worker_conn.close()
+			conns.append(conn)
+			workers.append(worker)
+
+		try:
+			while True:
+				hubs_old = self.__hubs
+				auths_old = self.__auths
+				volume = 0
+
+				self.__auths = np.zeros(self.__n)
+				for conn in conns:
+					data = conn.recv_bytes()
+					volume += len(data)
+					self.__auths += np.frombuffer(data, dtype=np.float64)
+				max_score = self.__auths.max(axis=0)
+				if max_score != 0:
+					self.__auths = self.__auths / max_score
+				self.all_auths.append(self.__auths)
+
+				data = self.__auths.tobytes()
+				for conn in conns:
+					conn.send_bytes(data)
+					volume += len(data)
+
+				hubs = []
+				for conn in conns:
+					data = conn.recv_bytes()
+					volume += len(data)
+					hubs.append(np.frombuffer(data, dtype=np.float64))
+				self.__hubs = np.concatenate(hubs)
+				max_score = self.__hubs.max(axis=0)
+				if max_score != 0:
+					self.__hubs = self.__hubs / max_score
+				self.all_hubs.append(self.__hubs)
+
+				done = (((abs(self.__hubs - hubs_old)) < epsilon_matrix).all()) and (((abs(self.__auths - auths_old)) < epsilon_matrix).all())
+				data = np.array([max_score, done], dtype=np.float64).tobytes()
+				for conn in conns:
+					conn.send_bytes(data)
+					volume += len(data)
+				self.comm_volume.append(volume)
+
+				if done:
+					break
+		finally:
+			for conn in conns:
+				conn.close()
+			for worker in workers:
+				worker.join()
+
+	def get_hubs(self):
+		"""Returns the hubbiness for each node (user)
+		"""
+		return self.__hubs
+
+	def get_auths(self):
+		"""Returns the authority for each node (user)
+		"""
+		return self.__auths
+
+	def get_comm_volume(self):
+		"""Returns the number of bytes exchanged with the workers for each
+		iteration
+		"""
+		return self.comm_volume
+
 class DatasetReader():
 	"""An instance of DatasetReader is used to read different files from the
 	dataset
@@ -205,6 +361,15 @@ class DatasetReader():
 			index_id_map = pickle.load(f)
 		return index_id_map
 
+	def read_user_table(self, user_table_path):
+		"""Returns the table (stored in a file) containing details of all users
+		as columns aligned to the link matrix index
+
+		Args:
+			user_table_path: Path to the file where the table is stored
+		"""
+		return UserTable.load(user_table_path)
+
 	def read_link_matrix(self, link_matrix_path, is_sparse=False):
 		"""Returns the array (stored in a file) that represents the link matrix
 
@@ -224,9 +389,9 @@ def main():
 	sparse = True
 	epsilon = 1e-10
 	show_iters = False
+	num_workers = 1
 
-	users_path = '../data/users'
-	map_path = '../data/map'
+	user_table_path = '../data/user_table'
 	sparse_link_matrix_path = '../data/sparse_link_matrix'
 	dense_link_matrix_path = '../data/dense_link_matrix'
 	if sparse:
@@ -236,13 +401,17 @@ def main():
 
 	# Load the stored data into objects
 	r = DatasetReader()
-	users = r.read_users(users_path)
-	index_id_map = r.read_map(map_path)
+	user_table = r.read_user_table(user_table_path)
 	link_matrix = r.read_link_matrix(link_matrix_path, is_sparse=sparse)
 
 	# Run the algorithm
-	h = HITS(link_matrix, users, index_id_map, is_sparse=sparse)
+	if num_workers > 1:
+		h = ShardedHITS(link_matrix, user_table, None, is_sparse=sparse, num_workers=num_workers)
+	else:
+		h = HITS(link_matrix, user_table, None, is_sparse=sparse)
 	h.calc_scores(epsilon=epsilon)
+	if num_workers > 1:
+		print('Bytes exchanged per iteration:', np.mean(h.get_comm_volume()))
 	
 	if show_iters:
 		x = h.get_all_hubs()